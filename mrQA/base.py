@@ -553,6 +553,12 @@ class NonCompliantDataset(BaseDataset):
             raise TypeError(
                 'Expected str, got {}'.format(type(ref_seq)))
 
+        if not non_compliant_params:
+            return
+
+        # the set of non-compliant parameter names is same for all the
+        # parameters of this run, look it up only once
+        nc_param_names = self._nc_params_map.setdefault(seq_id, set())
         for param_tupl in non_compliant_params:
             # if not isinstance(param_tupl, BaseParameter):
             #     raise TypeError(
@@ -566,9 +572,7 @@ class NonCompliantDataset(BaseDataset):
                                    seq_id=seq_id, run_id=run_id,
                                    param=param_tupl, param_name=param_name,
                                    ref_seq=ref_seq)
-            if seq_id not in self._nc_params_map:
-                self._nc_params_map[seq_id] = set()
-            self._nc_params_map[seq_id].add(param_name)
+            nc_param_names.add(param_name)
 
     def _nc_tree_add_node(self, subject_id, session_id, seq_id, run_id,
                           param, param_name, ref_seq=None):
@@ -594,32 +598,13 @@ class NonCompliantDataset(BaseDataset):
         if ref_seq is None:
             ref_seq = '__NOT_SPECIFIED__'
 
-        if param_name not in self._nc_tree_map:
-            self._nc_tree_map[param_name] = dict()
-
-        if seq_id not in self._nc_tree_map[param_name]:
-            self._nc_tree_map[param_name][seq_id] = dict()
-
-        if subject_id not in self._nc_tree_map[param_name][seq_id]:
-            self._nc_tree_map[param_name][seq_id][subject_id] = dict()
-
-        if session_id not in self._nc_tree_map[param_name][seq_id][subject_id]:
-            self._nc_tree_map[param_name][seq_id][subject_id][
-                session_id] = dict()
-
-        if ref_seq not in (
-                self._nc_tree_map[param_name][seq_id][subject_id][session_id]):
-            self._nc_tree_map[param_name][seq_id][subject_id][session_id][
-                ref_seq] = dict()
-
-        if run_id not in \
-            self._nc_tree_map[param_name][seq_id][subject_id][session_id][
-                ref_seq]:
-            self._nc_tree_map[param_name][seq_id][subject_id][session_id][
-                ref_seq][run_id] = dict()
-
-        self._nc_tree_map[param_name][seq_id][subject_id][session_id][ref_seq][
-            run_id] = param
+        # walk down the tree once, creating the missing levels on the way
+        runs = (self._nc_tree_map.setdefault(param_name, {})
+                .setdefault(seq_id, {})
+                .setdefault(subject_id, {})
+                .setdefault(session_id, {})
+                .setdefault(ref_seq, {}))
+        runs[run_id] = param
 
     def load(self):
         pass
@@ -180,8 +180,7 @@ def monitor(name: str,
         dataset = load_mr_dataset(last_mrds_path)
         modified_folders = folders_modified_since(
             input_dir=data_source,
-            last_reported_on=last_reported_on,
-            output_dir=output_dir
+            last_reported_on=last_reported_on
         )
         if modified_folders:
             new_dataset = import_dataset(data_source=modified_folders,
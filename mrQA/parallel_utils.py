@@ -1,5 +1,6 @@
 import os
 import subprocess
+from itertools import chain
 from pathlib import Path
 from time import sleep
 from typing import Union, Iterable
@@ -251,13 +252,14 @@ def _get_terminal_folders(data_source: Union[str, Path],
     subject_list : Iterable
         List of subject ids
     """
-    terminal_folder_list = []
     # Get the list of subject ids
-    for directory in valid_dirs(data_source):
-        sub_folders = folders_with_min_files(directory, pattern,
-                                             min_count)
-        terminal_folder_list.extend(sub_folders)
+    terminal_folder_list = list(chain.from_iterable(
+        folders_with_min_files(directory, pattern, min_count)
+        for directory in valid_dirs(data_source)))
+    # Keep only unique subject ids, in the order in which they were found,
+    # so that no folder is assigned to more than one worker
+    unique_folders = list(dict.fromkeys(terminal_folder_list))
     # Store the list of unique subject ids to a text file given by
     # output_path
-    list2txt(all_ids_path, list(set(terminal_folder_list)))
-    return terminal_folder_list
+    list2txt(all_ids_path, unique_folders)
+    return unique_folders
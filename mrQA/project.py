@@ -176,8 +176,19 @@ def horizontal_audit(dataset: BaseDataset,
     include_params = hz_audit_config.get('include_parameters', None)
     stratify_by = hz_audit_config.get('stratify_by', None)
     skip_sequences = hz_audit_config.get('skip_sequences', [])
+    # reference sequence for each (modified) sequence name, None if missing
+    ref_sequences = {}
 
     for seq_name in dataset.get_sequence_ids():
+        # skipping depends only on the sequence name, so check it once
+        # instead of checking it for every run of the sequence
+        skip_substr = next((substr for substr in skip_sequences
+                            if substr in seq_name.lower()), None)
+        if skip_substr is not None:
+            logger.warning(f'Skipping {seq_name} sequence as it contains '
+                           f'{skip_substr}')
+            continue
+
         # a temporary placeholder for compliant sequences. It will be
         # merged to compliant dataset if all the subjects are compliant
         temp_dataset = CompliantDataset(name=dataset.name,
@@ -186,23 +197,19 @@ def horizontal_audit(dataset: BaseDataset,
         compliant_flag = True
         undetermined_flag = False
         for subj, sess, run, seq in dataset.traverse_horizontal(seq_name):
-            try:
-                for substr in skip_sequences:
-                    if substr in seq_name.lower():
-                        logger.warning(
-                            f'Skipping {seq_name} sequence as it contains '
-                            f'{substr}')
-                        raise ValueError("This sequence should be skipped.")
-            except ValueError:
-                continue
-
             sequence_name = modify_sequence_name(
                 seq, stratify_by,
                 datasets=[compliant_ds, non_compliant_ds, undetermined_ds])
 
-            try:
-                ref_sequence = ref_protocol[sequence_name]
-            except KeyError:
+            # many runs share the same sequence name, look up the reference
+            # only once for each of them
+            if sequence_name not in ref_sequences:
+                try:
+                    ref_sequences[sequence_name] = ref_protocol[sequence_name]
+                except KeyError:
+                    ref_sequences[sequence_name] = None
+            ref_sequence = ref_sequences[sequence_name]
+            if ref_sequence is None:
                 logger.warning(f'No reference protocol for {seq_name} '
                                f'sequence.')
                 undetermined_ds.add(subject_id=subj, session_id=sess,
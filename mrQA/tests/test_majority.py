@@ -1,17 +1,19 @@
 import shutil
+from collections import Counter
 from subprocess import CalledProcessError
 
 from protocol import UnspecifiedType
 
 from mrQA.config import EqualCountType, CannotComputeMajority
 from mrQA.tests.conftest import THIS_DIR
-from mrQA.utils import majority_values, folders_modified_since
+from mrQA.utils import majority_values, folders_modified_since, pick_majority
 from mrQA.utils import list2txt, txt2list
+import pytest
 import unittest
 import tempfile
 from pathlib import Path
 from MRdataset.utils import random_name
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 
 class TestMajorityAttributeValues(unittest.TestCase):
@@ -191,6 +193,11 @@ class TestMajorityAttributeValues(unittest.TestCase):
         self.assertEqual(maj_attr_vals['habitat'], 'savanna')
         self.assertEqual(maj_attr_vals['color'], 'orange')
 
+    def test_pick_majority_keeps_counter(self):
+        counter = Counter(['a', 'a', None, 'b'])
+        self.assertEqual(pick_majority(counter, 'param'), 'a')
+        self.assertEqual(counter, Counter({'a': 2, None: 1, 'b': 1}))
+
 
 class TestTxt2List(unittest.TestCase):
     def test_valid_file(self):
@@ -200,6 +207,13 @@ class TestTxt2List(unittest.TestCase):
         actual = txt2list(file_path)
         self.assertEqual(expected, actual)
 
+    def test_mixed_line_endings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / 'test.txt'
+            file_path.write_bytes(b'a\rb\r\nc\n')
+            actual = txt2list(file_path)
+        self.assertEqual(['a', 'b', 'c'], actual)
+
     def test_invalid_file(self):
         file_path = 'tests/test_files/invalid.txt'
         with self.assertRaises(FileNotFoundError):
@@ -217,7 +231,6 @@ class TestModifiedTimeDirectory(unittest.TestCase):
         folders = folders_modified_since(
             input_dir='/tmp/mrqa',
             last_reported_on=now.strftime("%m/%d/%Y %H:%M:%S"),
-            output_dir='/tmp/',
             time_format='datetime'
         )
         self.assertEqual(len(folders), 0)
@@ -245,6 +258,45 @@ class TestModifiedTimeDirectory(unittest.TestCase):
         date_time = now.strftime("%m/%d/%Y %H:%M:%S")
         valid_files = folders_modified_since(input_dir=str(self.temp_ds),
                                              last_reported_on=date_time,
-                                             output_dir='/tmp/',
                                              time_format='datetime')
         self.assertEqual(len(valid_files), 10)
+
+    def test_output_dir_deprecated(self):
+        date_time = datetime(2023, 2, 5, 18, 00).strftime("%m/%d/%Y %H:%M:%S")
+        with pytest.warns(DeprecationWarning):
+            valid_files = folders_modified_since(input_dir=str(self.temp_ds),
+                                                 last_reported_on=date_time,
+                                                 output_dir='/tmp/',
+                                                 time_format='datetime')
+        self.assertEqual(len(valid_files), 10)
+
+    def test_not_modified_since(self):
+        later = datetime.now() + timedelta(days=1)
+        date_time = later.strftime("%m/%d/%Y %H:%M:%S")
+        valid_files = folders_modified_since(input_dir=str(self.temp_ds),
+                                             last_reported_on=date_time,
+                                             time_format='datetime')
+        self.assertEqual(valid_files, [])
+
+    def test_ignores_non_dicom(self):
+        date_time = datetime(2023, 2, 5, 18, 00).strftime("%m/%d/%Y %H:%M:%S")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            subdir = Path(tmpdir) / 'sub-01'
+            subdir.mkdir()
+            (subdir / 'notes.txt').write_text('not a dicom file')
+            valid_files = folders_modified_since(input_dir=tmpdir,
+                                                 last_reported_on=date_time,
+                                                 time_format='datetime')
+        self.assertEqual(valid_files, [])
+
+    def test_ignores_symlinked_files(self):
+        date_time = datetime(2023, 2, 5, 18, 00).strftime("%m/%d/%Y %H:%M:%S")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            subdir = Path(tmpdir) / 'sub-01'
+            subdir.mkdir()
+            dcm_path = next(next(self.temp_ds.iterdir()).iterdir())
+            (subdir / 'linked.dcm').symlink_to(dcm_path)
+            valid_files = folders_modified_since(input_dir=tmpdir,
+                                                 last_reported_on=date_time,
+                                                 time_format='datetime')
+        self.assertEqual(valid_files, [])
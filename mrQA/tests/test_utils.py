@@ -12,7 +12,8 @@ from mrQA.utils import split_list, convert2ascii, next_month, previous_month, \
     has_substring, filter_epi_fmap_pairs, get_protocol_from_file, \
     get_config_from_file, valid_paths, folders_with_min_files, \
     find_terminal_folders, save_audit_results, is_folder_with_no_subfolders, \
-    get_reference_protocol, get_config, is_writable, send_email, logger
+    get_reference_protocol, get_config, is_writable, send_email, logger, \
+    get_last_valid_record
 from protocol import SiemensMRImagingProtocol, MRImagingProtocol
 
 
@@ -209,6 +210,24 @@ def test_get_config_from_file():
         get_config_from_file(THIS_DIR / 'resources/invalid-json.json')
 
 
+def test_get_config_from_file_modified():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        config_path = Path(tmpdirname) / 'config.json'
+        config_path.write_text('{"a": 1}')
+        assert get_config_from_file(config_path) == {'a': 1}
+        config_path.write_text('{"a": 2, "b": 3}')
+        assert get_config_from_file(config_path) == {'a': 2, 'b': 3}
+
+
+def test_get_config_from_file_returns_copy():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        config_path = Path(tmpdirname) / 'config.json'
+        config_path.write_text('{"a": {"b": 1}}')
+        config = get_config_from_file(config_path)
+        config['a']['b'] = 2
+        assert get_config_from_file(config_path) == {'a': {'b': 1}}
+
+
 def test_valid_paths():
     with pytest.raises(ValueError):
         valid_paths(None)
@@ -331,6 +350,20 @@ def test_save_audit_results():
         save_audit_results('/sys/firmware/hz.adt.pkl', {})
 
 
+def test_get_last_valid_record_skips_missing():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        folder = Path(tmpdirname)
+        mrds_path = folder / 'first.mrds.pkl'
+        mrds_path.touch()
+        with open(folder / 'past_record.txt', 'w') as fp:
+            fp.write(f'ts1,report1.html,{mrds_path}\n')
+            fp.write(f'ts2,report2.html,{folder / "missing.mrds.pkl"}\n')
+            fp.write('ts3,report3.html\n')
+            fp.write('\n')
+        assert get_last_valid_record(folder) == ('ts1', 'report1.html',
+                                                 str(mrds_path))
+
+
 # Test when folder has subfolders
 def test_has_subfolders():
     with tempfile.TemporaryDirectory() as tmpdirname:
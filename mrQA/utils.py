@@ -1,19 +1,23 @@
 import json
+import os
 import pickle
 import re
 import tempfile
 import time
 import unicodedata
+import warnings
 from collections import Counter
+from copy import deepcopy
 from datetime import datetime, timedelta, timezone
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from itertools import takewhile
+from functools import lru_cache
+from itertools import takewhile, islice
 from pathlib import Path
 from smtplib import SMTP
-from subprocess import run, CalledProcessError, TimeoutExpired, Popen
+from subprocess import CalledProcessError, TimeoutExpired, Popen
 from typing import Union, List, Optional, Any, Iterable, Sized
 
 from MRdataset import BaseDataset, is_dicom_file
@@ -209,6 +213,11 @@ def get_items_upto_count(dict_: Counter, rank: int = 1):
     list: List
         A list of key-value pairs upto the rank specified
     """
+    if rank == 1 and dict_:
+        # ties for the top count only need the maximum, not a full sort.
+        # Items keep insertion order, same as most_common for equal counts
+        top_count = max(dict_.values())
+        return [(k, v) for k, v in dict_.items() if v == top_count]
     values_desc_order = dict_.most_common()
     value_at_rank = values_desc_order[rank - 1][1]
     return list(takewhile(lambda x: x[1] >= value_at_rank, values_desc_order))
@@ -243,7 +252,6 @@ def make_output_paths(output_dir, dataset):
         subject lists for each modality
     """
     ts = timestamp()
-    # utc = datetime.strptime(ts, '%m_%d_%Y_%H_%M_%S').timestamp()
     filename = f'{dataset.name}{DATE_SEPARATOR}{ts}'
     report_path = report_fpath(output_dir, filename)
     mrds_path = mrds_fpath(output_dir, filename)
@@ -266,8 +274,6 @@ def log_report_history(output_dir, mrds_path, report_path, ts):
         fullpath to the report file
     ts : str
         timestamp
-    utc : float
-        timestamp in UTC zone
     """
     records_filepath = past_records_fpath(output_dir)
     if not records_filepath.parent.is_dir():
@@ -306,17 +312,14 @@ def majority_values(list_seqs: list,
     if not args_valid:
         return maj_value
 
-    counters_dict = {}
-    categories = set()
     if not include_params:
         raise ValueError('Expected a list of parameters to include. Got None')
-    for seq in list_seqs:
-        categories.update(include_params)
-        for param in include_params:
-            counter = counters_dict.get(param, Counter({default: 0}))
-            value = seq.get(param, default)
-            counter[value] += 1
-            counters_dict[param] = counter
+    # Build one counter per parameter in a single pass, the counting
+    # happens inside Counter's C implementation
+    counters_dict = {
+        param: Counter(seq.get(param, default) for seq in list_seqs)
+        for param in include_params
+    }
 
     majority_dict = {}
     for parameter, counter in counters_dict.items():
@@ -371,9 +374,15 @@ def pick_majority(counter_: Counter, parameter: str, default: Any = None):
         logger.error('Expected at least one entry in counter. Got 0')
         raise ValueError('Expected at least one entry in counter. Got 0')
     if len(counter_) == 1:
-        return list(counter_.keys())[0]
-    # there are more than 1 value, remove default, and computer majority
-    _ = counter_.pop(default, None)
+        return next(iter(counter_))
+    # there are more than 1 value, remove default, and computer majority.
+    # Work on a copy, so that the caller's counter is left untouched
+    if default in counter_:
+        counter_ = counter_.copy()
+        del counter_[default]
+    if len(counter_) == 1:
+        # only one value is left after removing default, no need to rank
+        return next(iter(counter_))
     items_rank1 = get_items_upto_count(counter_, rank=1)
     # If there are many values for rank 1 with equal count,
     # cannot say which is majority
@@ -420,7 +429,7 @@ def _check_args_validity(list_: List) -> bool:
     return True
 
 
-def split_list(dir_index: Sized, num_chunks: int) -> Iterable:
+def split_list(dir_index: Sized, num_chunks: int) -> tuple:
     """
     Adapted from https://stackoverflow.com/questions/2130016/splitting-a-list-into-n-parts-of-approximately-equal-length # noqa
 
@@ -461,8 +470,12 @@ def split_list(dir_index: Sized, num_chunks: int) -> Iterable:
         num_chunks = len(dir_index)
     k, m = divmod(len(dir_index), num_chunks)
     #  k, m = (len(dir_index)//num_chunks, len(dir_index)%num_chunks)
-    return (dir_index[i * k + min(i, m):(i + 1) * k + min(i + 1, m)]
-            for i in range(num_chunks))
+    # the first m chunks get one extra element
+    offsets = [0]
+    for i in range(num_chunks):
+        offsets.append(offsets[-1] + k + (1 if i < m else 0))
+    return tuple(dir_index[offsets[i]:offsets[i + 1]]
+                 for i in range(num_chunks))
 
 
 def txt2list(txt_filepath: Union[str, Path]) -> list:
@@ -488,11 +501,11 @@ def txt2list(txt_filepath: Union[str, Path]) -> list:
         txt_filepath = Path(txt_filepath).resolve()
     if not txt_filepath.exists():
         raise FileNotFoundError(f'Invalid path {txt_filepath}')
-    # Generate a list of folder paths stored in given txt_file
-    with open(txt_filepath, 'r', encoding='utf-8') as fp:
-        line_list = [line.strip() for line in fp.readlines() if line.strip()]
-    # Don't return empty string
-    return line_list
+    # Generate a list of folder paths stored in given txt_file. Read the
+    # whole file at once, text mode translates '\r\n' and '\r' to '\n'
+    content = txt_filepath.read_text(encoding='utf-8')
+    # Split only on '\n' like readlines. Don't return empty string
+    return [line for line in map(str.strip, content.split('\n')) if line]
 
 
 def list2txt(fpath: Path, list_: list) -> None:
@@ -509,9 +522,8 @@ def list2txt(fpath: Path, list_: list) -> None:
     """
     parent_dir = fpath.parent
     parent_dir.mkdir(parents=True, exist_ok=True)
-    list_str = [str(x) for x in list_]
     with open(fpath, 'w', encoding='utf-8') as fp:
-        fp.write('\n'.join(list_str))
+        fp.write('\n'.join(map(str, list_)))
 
 
 def execute_local(script_path: str) -> None:
@@ -615,6 +627,13 @@ def is_integer_number(n: Union[int, float]) -> bool:
     bool
         True if the number is an integer, False otherwise
     """
+    # exact type checks are cheaper, and cover the common case
+    num_type = type(n)
+    if num_type is int:
+        return True
+    if num_type is float:
+        return n.is_integer()
+    # subclasses, for ex. bool or numpy.float64
     if isinstance(n, int):
         return True
     if isinstance(n, float):
@@ -662,14 +681,23 @@ def convert2ascii(value, allow_unicode=False):
     underscores, or hyphens. Convert to lowercase. Also strip leading and
     trailing whitespace, dashes, and underscores.
     """
-    value = str(value)
+    return _convert2ascii(str(value), allow_unicode)
+
+
+_NON_WORD_CHARS = re.compile(r'[^\w\s-]')
+_DASHES_OR_SPACES = re.compile(r'[-\s]+')
+
+
+@lru_cache(maxsize=1024)
+def _convert2ascii(value: str, allow_unicode: bool) -> str:
+    """Cached implementation of convert2ascii, as sequence names repeat"""
     if allow_unicode:
         value = unicodedata.normalize('NFKC', value)
     else:
         value = unicodedata.normalize(
             'NFKD', value).encode('ascii', 'ignore').decode('ascii')
-    value = re.sub(r'[^\w\s-]', '', value)
-    return re.sub(r'[-\s]+', '-', value).strip('-_')
+    value = _NON_WORD_CHARS.sub('', value)
+    return _DASHES_OR_SPACES.sub('-', value).strip('-_')
 
 
 # def round_if_numeric(value: Union[int, float],
@@ -731,9 +759,7 @@ def compute_majority(dataset: BaseDataset, seq_name, config_dict=None):
 
     for subj, sess, runs, seq in dataset.traverse_horizontal(seq_name):
         sequence_id = modify_sequence_name(seq, stratify_by, None)
-        if sequence_id not in seq_dict:
-            seq_dict[sequence_id] = []
-        seq_dict[sequence_id].append(seq)
+        seq_dict.setdefault(sequence_id, []).append(seq)
 
     for seq_id in seq_dict:
         try:
@@ -813,10 +839,14 @@ def _datasets_processed(dir_path, ignore_case=True):
     -------
 
     """
+    # os.scandir caches the file type while reading the directory, so
+    # checking for folders doesn't require another stat call
+    with os.scandir(dir_path) as entries:
+        names = [entry.name for entry in entries if entry.is_dir()]
     if not ignore_case:
-        return [x.name for x in dir_path.iterdir() if x.is_dir()]
+        return names
     else:
-        return [x.name.lower() for x in dir_path.iterdir() if x.is_dir()]
+        return [name.lower() for name in names]
 
 
 def _get_time(time_format: str, last_reported_on: str):
@@ -837,7 +867,7 @@ def _get_time(time_format: str, last_reported_on: str):
 
 def folders_modified_since(last_reported_on: str,
                            input_dir: Union[str, Path],
-                           output_dir: Union[str, Path],
+                           output_dir: Union[str, Path, None] = None,
                            time_format: str = 'timestamp') -> List:
     """
     Find files modified since a given time
@@ -849,59 +879,78 @@ def folders_modified_since(last_reported_on: str,
     last_reported_on: str
         Reference time to compare against.
     output_dir: str or Path
-        Absolute path to the directory where the output file will be stored.
+        Deprecated, not used anymore. It will be removed in a future
+        release.
     time_format: str
         Format of the time. One of ['timestamp', 'datetime'].
 
     Returns
     -------
-    valid_files: List
-        A list of files modified since the given time.
+    modified_folders: List
+        A list of folders with dicom files modified since the given time.
 
     Raises
     ------
     ValueError
         If the time format is invalid.
-    NotImplementedError
-        If the time format is not one of ['timestamp', 'datetime'].
-    FileNotFoundError
-        If the executable `find` is not found.
-    CalledProcessError
-        If the command `find` fails.
-    TimeoutExpired
-        If the command `find` times out.
     """
+    if output_dir is not None:
+        warnings.warn('output_dir is not used by folders_modified_since, '
+                      'and will be removed in a future release.',
+                      DeprecationWarning, stacklevel=2)
     modified_folders = set()
 
     mod_time = get_datetime(last_reported_on)
-    out_path = Path(output_dir) / 'modified_folders_since.txt'
-    if out_path.is_file():
-        out_path.unlink()
+    if not isinstance(mod_time, datetime):
+        # get_datetime returns the input as is, if it doesn't match the
+        # expected formats. Try parsing other formats as well
+        mod_time = _get_time('datetime', mod_time)
+    # naive datetime objects are interpreted as local time
+    cutoff = mod_time.timestamp()
+
+    if not Path(input_dir).is_dir():
+        logger.error(f'Folder not found: {input_dir}')
+        return []
 
-    cmd = f"find {input_dir} -type f -newermt '{mod_time}' > {out_path}"
+    # Walk the tree in-process, instead of spawning `find`. Like
+    # `find -type f`, only regular files are checked and symlinks are
+    # not followed
+    folders = [os.fspath(input_dir)]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as dir_entries:
+                entries = list(dir_entries)
+            folders.extend(entry.path for entry in entries
+                           if entry.is_dir(follow_symlinks=False))
+        except OSError as exc:
+            logger.warning(f'Could not read folder {folder}: {exc}')
+            continue
+        if _folder_has_modified_dicom(entries, cutoff):
+            modified_folders.add(Path(folder))
+    return list(modified_folders)
 
-    try:
-        run(cmd, check=True, shell=True)
-        modified_files = txt2list(out_path)
-        for f in modified_files:
-            if not Path(f).is_file():
-                logger.warning(f'File {f} not found.')
-            if not is_dicom_file(f):
-                continue
-            else:
-                modified_folders.add(Path(f).parent)
-    except FileNotFoundError as exc:
-        logger.error(
-            'Process failed because file could not be found.\n %s', exc)
-    except CalledProcessError as exc:
-        logger.error(
-            'Process failed because did not return a successful'
-            ' return code. Returned %s \n %s', exc.returncode, exc
-        )
-    except TimeoutExpired as exc:
-        logger.error('Process timed out.\n %s', exc)
 
-    return list(modified_folders)
+def _folder_has_modified_dicom(entries: List[os.DirEntry],
+                               cutoff: float) -> bool:
+    """
+    Check if any of the regular files among the directory entries is a
+    dicom file, modified after the cutoff (a POSIX timestamp).
+    Symlinks are not followed.
+    """
+    for entry in entries:
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if entry.stat(follow_symlinks=False).st_mtime <= cutoff:
+                continue
+        except OSError:
+            logger.warning(f'File {entry.path} not found.')
+            continue
+        # a single modified dicom file is enough to mark the folder
+        if is_dicom_file(entry.path):
+            return True
+    return False
 
 
 def get_last_valid_record(folder_path: Path) -> Optional[tuple]:
@@ -922,18 +971,18 @@ def get_last_valid_record(folder_path: Path) -> Optional[tuple]:
     if not record_filepath.is_file():
         logger.warning('No past records found.')
         return None
-    i = -1
     with open(record_filepath, 'r', encoding='utf-8') as fp:
-        while True:
-            lines = fp.readlines()
-            num_records = len(lines)
-            if i < -num_records:
-                return None
-            last_line = lines[i].strip('\n').split(',')
-            last_reported_on, last_report_path, last_mrds_path = last_line
-            if Path(last_mrds_path).is_file():
-                return last_reported_on, last_report_path, last_mrds_path
-            i -= 1
+        lines = fp.readlines()
+    # read the file only once, and walk back from the latest record
+    for line in reversed(lines):
+        last_line = line.strip('\n').split(',')
+        if len(last_line) != 3:
+            logger.warning(f'Skipping malformed record : {line.strip()}')
+            continue
+        last_reported_on, last_report_path, last_mrds_path = last_line
+        if Path(last_mrds_path).is_file():
+            return last_reported_on, last_report_path, last_mrds_path
+    return None
 
 
 def get_timestamps():
@@ -941,8 +990,7 @@ def get_timestamps():
     Get the current timestamp in UTC and local time
     """
     now = datetime.now(timezone.utc)
-    now = now.replace(tzinfo=timezone.utc)
-    ts = datetime.timestamp(now)
+    ts = now.timestamp()
     date_time = now.strftime('%m/%d/%Y %H:%M:%S%z')
     return {
         'utc'      : ts,
@@ -994,7 +1042,9 @@ def folders_with_min_files(root: Union[Path, str],
     terminals = find_terminal_folders(root)
 
     for folder in terminals:
-        if len([file_ for file_ in folder.rglob(pattern)]) >= min_count:
+        # stop scanning a folder as soon as it has enough matching files
+        matches = islice(folder.rglob(pattern), max(min_count, 0))
+        if sum(1 for _ in matches) >= min_count:
             yield folder
 
     return
@@ -1010,12 +1060,15 @@ def is_folder_with_no_subfolders(fpath):
         raise FileNotFoundError(f'Folder not found: {fpath}')
 
     sub_dirs = []
-    for file_ in fpath.iterdir():
-        if file_.is_dir():
-            sub_dirs.append(file_)
-        elif file_.suffix == '.dcm':
-            # you have reached a folder which contains '.dcm' files
-            break
+    # scandir gets the entry type from the directory listing itself, and
+    # a Path is built only for the sub-folders
+    with os.scandir(fpath) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                sub_dirs.append(fpath / entry.name)
+            elif os.path.splitext(entry.name)[1] == '.dcm':
+                # you have reached a folder which contains '.dcm' files
+                break
 
     # sub_dirs = [file_ for file_ in fpath.iterdir() if file_.is_dir()]
     return len(sub_dirs) < 1, sub_dirs
@@ -1061,8 +1114,9 @@ def save_audit_results(filepath: Union[str, Path], result_dict) -> None:
         raise exc
 
     with open(filepath, 'wb') as f:
-        # save dict of the object as pickle
-        pickle.dump(result_dict, f)
+        # save dict of the object as pickle, the highest protocol is
+        # faster and more compact for large datasets
+        pickle.dump(result_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 def find_terminal_folders(root, leave=True, position=0):
@@ -1187,10 +1241,19 @@ def valid_paths(files: Union[List, str]) -> Union[List[Path], Path]:
             raise FileNotFoundError('Invalid File {0}'.format(files))
         return Path(files).resolve()
     elif isinstance(files, Iterable):
+        # Check and resolve each distinct path only once, as the same
+        # path may be repeated several times in the list
+        resolved = {}
+        paths = []
         for file in files:
-            if not Path(file).is_file():
-                raise FileNotFoundError('Invalid File {0}'.format(file))
-        return [Path(f).resolve() for f in files]
+            key = str(file)
+            if key not in resolved:
+                filepath = Path(key)
+                if not filepath.is_file():
+                    raise FileNotFoundError('Invalid File {0}'.format(file))
+                resolved[key] = filepath.resolve()
+            paths.append(resolved[key])
+        return paths
     else:
         raise NotImplementedError('Expected str or Path or Iterable, '
                                   f'Got {type(files)}')
@@ -1223,8 +1286,8 @@ def modify_sequence_name(seq: "BaseSequence", stratify_by: str,
         else:
             stratify_value = ''
 
-        seq_name_with_stratify = ATTRIBUTE_SEPARATOR.join([seq.name,
-                                                           stratify_value])
+        seq_name_with_stratify = (f'{seq.name}{ATTRIBUTE_SEPARATOR}'
+                                  f'{stratify_value}')
     # elif stratify_by:
     #     try:
     #         stratify_value = seq[stratify_by].get_value()
@@ -1243,7 +1306,9 @@ def modify_sequence_name(seq: "BaseSequence", stratify_by: str,
 
 def get_config_from_file(config_path: Union[Path, str]) -> dict:
     """
-    Read the configuration file and return the contents as a dictionary
+    Read the configuration file and return the contents as a dictionary.
+    The parsed contents are cached, and re-read only if the file is
+    modified. Each call returns a separate copy.
 
     Parameters
     ----------
@@ -1265,15 +1330,25 @@ def get_config_from_file(config_path: Union[Path, str]) -> dict:
                                 'file does not exist or it is not a '
                                 'file.')
 
-    # read json file
-    with open(config_path, 'r') as f:
-        try:
-            config = json.load(f)
-        except ValueError:
-            # json.decoder.JSONDecodeError is a subclass of ValueError
-            raise ValueError('Invalid JSON file provided in config_path '
-                             'Expected a valid JSON file.')
+    config_path = config_path.resolve()
+    # modification time and size are a part of the key, so that the cached
+    # contents are invalidated if the file is modified
+    stat = config_path.stat()
+    # copy the cached contents, so that callers modifying the returned
+    # config don't alter the config seen by later calls
+    return deepcopy(_read_config(str(config_path), stat.st_mtime_ns,
+                                 stat.st_size))
 
+
+@lru_cache(maxsize=32)
+def _read_config(config_path: str, mtime_ns: int, size: int) -> dict:
+    """Read and parse the JSON configuration file, see get_config_from_file"""
+    try:
+        config = json.loads(Path(config_path).read_bytes())
+    except ValueError:
+        # json.decoder.JSONDecodeError is a subclass of ValueError
+        raise ValueError('Invalid JSON file provided in config_path '
+                         'Expected a valid JSON file.')
     return config
 
 